@@ -1,10 +1,14 @@
 # -*- coding: utf-8 -*-
+import os
+from math import prod
+
+LIMIT = 254 * 254 * 254
+
+
 def name_to_color_code(name):
-    seed = 1
-    limit = 254 * 254 * 254
-    for char in name:
-        seed *= ord(char)
-    hex_code = hex(seed % limit)[2:]
+    # Product of the code points, computed without a Python level loop
+    seed = prod(map(ord, name)) % LIMIT
+    hex_code = hex(seed)[2:]
     if len(hex_code) > 6:
         hex_code = hex_code[:6]
     #hex_code = '#' + hex_code
@@ -14,14 +18,16 @@ def name_to_color_code(name):
 
 
 def get_index():
-    f = open("./index.txt", "r")
-    index = int(f.read())
+    with open("./index.txt", "r") as f:
+        index = int(f.read())
     return index
 
 
 def update_index():
-    f = open("./index.txt", "r")
-    index = int(f.read()) + 1
-    f.close()
-    f = open("./index.txt", "w")
-    f.write(str(index))
+    with open("./index.txt", "r") as f:
+        index = int(f.read()) + 1
+    # Write to a temporary file and swap it in, so a crash never leaves a truncated index
+    with open("./index.txt.tmp", "w") as f:
+        f.write(str(index))
+    os.replace("./index.txt.tmp", "./index.txt")
+    return index
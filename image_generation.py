@@ -1,5 +1,7 @@
-from PIL import Image, ImageFilter, ImageDraw, ImageFont
 # -*- coding: utf-8 -*-
+from functools import lru_cache
+
+from PIL import Image, ImageFilter, ImageDraw, ImageFont
 
 '''
 import sys
@@ -7,11 +9,42 @@ reload(sys)
 sys.setdefaultencoding('Cp1252')
 '''
 
-def generate_and_save_image(name, main_color, color_name, index):
-    base = Image.open('base.jpg').convert('RGBA')
+# Fonts are loaded once at import instead of on every image
+BRAND_FNT = ImageFont.truetype('Roboto-Medium.ttf', 70)
+REGISTERED_FNT = ImageFont.truetype('Roboto-Medium.ttf', 30)
+NAME_FNT = ImageFont.truetype('Roboto-Medium.ttf', 40)
+COLOR_FNT = ImageFont.truetype('Roboto-Medium.ttf', 30)
+
+
+# Size of a text as the removed FreeTypeFont.getsize() reported it
+def _text_size(text, fnt):
+    left, top, right, bottom = fnt.getbbox(text)
+    return right, bottom
+
 
-    # make a blank image for the text, initialized to transparent text color
-    im = Image.new('RGBA', base.size, (255, 255, 255, 0))
+# The brand text never changes, so its layout is computed once as well
+BRAND = 'Filsiz Boya'
+BRAND_LENGTH = _text_size(BRAND, BRAND_FNT)
+REGISTERED_POS = (140 + BRAND_LENGTH[0], 530)
+NAME_Y = 520 + BRAND_LENGTH[1]
+
+# The base image is decoded once and shared by every generated image
+BASE = Image.open('base.jpg').convert('RGB')
+
+
+# Render a text once into a grayscale mask, later calls reuse it.
+# This works as the glyph atlas for every text shared between images.
+@lru_cache(maxsize=1024)
+def _render_text(text, fnt):
+    size = _text_size(text, fnt)
+    mask = Image.new('L', size, 0)
+    ImageDraw.Draw(mask).text((0, 0), text, 255, font=fnt)
+    return mask
+
+
+def generate_and_save_image(name, main_color, color_name, index):
+    # Everything is opaque, so draw straight onto a copy of the base
+    im = BASE.copy()
 
     draw = ImageDraw.Draw(im)
 
@@ -22,27 +55,20 @@ def generate_and_save_image(name, main_color, color_name, index):
 
     # Texts
     # Brand Text
-    brand_fnt = ImageFont.truetype('Roboto-Medium.ttf', 70)
-    brand = 'Filsiz Boya'
-    draw.text((140, 520), brand, 'black', font=brand_fnt)
+    im.paste('black', (140, 520), _render_text(BRAND, BRAND_FNT))
 
     # Registered Symbol
-    brand_length = brand_fnt.getsize(brand)
-    registered_fnt = ImageFont.truetype('Roboto-Medium.ttf', 30)
-    draw.text((140 + brand_length[0], 530), u'\u00ae', 'black', font=registered_fnt)
+    im.paste('black', REGISTERED_POS, _render_text(u'\u00ae', REGISTERED_FNT))
 
-    # Name and color name
-    name_fnt = ImageFont.truetype('Roboto-Medium.ttf', 40)
-    draw.text((140, 520 + brand_length[1]), name.decode('utf-8') + ' ' + color_name.title(), 'black', font=name_fnt)
+    # Name and color name, rarely repeated within a run so it is not cached
+    draw.text((140, NAME_Y), name + ' ' + color_name.title(), 'black', font=NAME_FNT)
 
     # Color
-    name_length = name_fnt.getsize(name)
-    color_fnt = ImageFont.truetype('Roboto-Medium.ttf', 30)
-    draw.text((140, 520 + brand_length[1] + name_length[1] + 40), main_color, main_color, font=color_fnt)
-
-    out = Image.alpha_composite(base, im)
+    name_length = _text_size(name, NAME_FNT)
+    im.paste(main_color, (140, NAME_Y + name_length[1] + 40), _render_text(main_color, COLOR_FNT))
 
-    out.save('output/' + str(index) + '_' + name + '.png')
+    # Fastest zlib level, the images are mostly flat colors anyway
+    im.save('output/' + str(index) + '_' + name + '.png', 'PNG', compress_level=1, optimize=False)
 
 '''
 main_color = '#FF0000'
@@ -1,49 +1,82 @@
 # -*- coding: utf-8 -*-
 import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
 import functions
 import color_namer
 import image_generation
 from name_list_manipulator import *
 
-# Generate and open file
-# generate_source_file(10000, 0)
 
-name_list = open('src/names/ordered_mixed_name_list.csv')
-name_list = csv.reader(name_list)
-
-# Create a list consisting name, color and color name
-names = []
-initial_error_counter = 0
-for name in name_list:
+# Runs in a worker process, fonts and base image are loaded once per worker
+def generate_image(name, main_color, color_name, index):
     try:
-        if int(name[1]) > 100:
-            color = functions.name_to_color_code(name[0])
-            actual_name, closest_name = color_namer.get_colour_name(tuple(int(color[i:i + 2], 16) for i in (0, 2, 4)))
-            if actual_name is None:
-                color_name = closest_name
-            else:
-                color_name = actual_name
-            names.append((name[0], '#' + color, color_name))
+        image_generation.generate_and_save_image(name, main_color, color_name, index)
+        return True
     except:
-        print('Color name error', name[0])
-        initial_error_counter += 1
-
-print ('Color and color name generation errors occured:', initial_error_counter)
-
-# Generate images
-index = 0
-image_generation_error_counter = 0
-success = 0
-for element in names:
-    if (success < 500):
-        try:
-            index += 1
-            image_generation.generate_and_save_image(element[0], element[1], element[2], index)
+        print("Image generation error: ", name)
+        return False
+
+
+# Wait for the submitted images and count the results
+def collect(futures, success, image_generation_error_counter):
+    for future in futures:
+        if future.result():
             success += 1
-            print ("Progress", str(float(success) / 500 * 100), '%')
-        except:
-            print("Image generation error: ", element[0])
+            # Printing every image slows the loop down on some consoles
+            if success % 25 == 0:
+                print(f"Progress {success / 500 * 100:.1f} %")
+        else:
             image_generation_error_counter += 1
+    return success, image_generation_error_counter
+
+
+if __name__ == '__main__':
+    # Generate and open file
+    # generate_source_file(10000, 0)
+
+    # Generate a color and color name for each name and hand its image to the workers
+    initial_error_counter = 0
+    index = 0
+    image_generation_error_counter = 0
+    success = 0
+    with open('src/names/ordered_mixed_name_list.csv', 'r', buffering=1 << 20, newline='') as name_list_file, \
+            ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        name_list = csv.reader(name_list_file)
+        pending = []
+        # Many names end up with the same color, look each color up only once
+        color_names = {}
+        # Bind the helpers once instead of looking them up on every row
+        name_to_color_code = functions.name_to_color_code
+        get_colour_name = color_namer.get_colour_name
+        for name in name_list:
+            # Only read further names if some of the submitted images failed
+            if success + len(pending) >= 500:
+                success, image_generation_error_counter = collect(pending, success, image_generation_error_counter)
+                pending = []
+                if success >= 500:
+                    break
+            try:
+                if int(name[1]) <= 100:
+                    continue
+                color = name_to_color_code(name[0])
+                color_name = color_names.get(color)
+                if color_name is None:
+                    actual_name, closest_name = get_colour_name(tuple(int(color, 16).to_bytes(3, 'big')))
+                    if actual_name is None:
+                        color_name = closest_name
+                    else:
+                        color_name = actual_name
+                    color_names[color] = color_name
+            except:
+                print('Color name error', name[0])
+                initial_error_counter += 1
+                continue
+
+            index += 1
+            pending.append(executor.submit(generate_image, name[0], '#' + color, color_name, index))
+        success, image_generation_error_counter = collect(pending, success, image_generation_error_counter)
 
-print ('Image generation errors occured:', image_generation_error_counter)
-print ('Successful generated:', image_generation_error_counter)
+    print ('Color and color name generation errors occured:', initial_error_counter)
+    print ('Image generation errors occured:', image_generation_error_counter)
+    print ('Successful generated:', success)
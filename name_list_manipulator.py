@@ -1,58 +1,38 @@
 import csv
+from itertools import zip_longest
+from operator import itemgetter
 
 
 def generate_source_file(item_count, start=0):
-    # Open and read
-    male_names_file = open('src/names/tr_isim_erkek.csv')
-    female_names_file = open('src/names/tr_isim_kadin.csv')
-    male_names = csv.reader(male_names_file)
-    female_names = csv.reader(female_names_file)
-
-    # Create separate lists
+    # Open, read and create separate lists
     male_names_list = []
-    for name in male_names:
-        if name[0] == '[isim]':
-            continue
-        male_names_list.append((name[0], int(name[1])))
+    with open('src/names/tr_isim_erkek.csv', 'r', buffering=1 << 20, newline='') as male_names_file:
+        for name in csv.reader(male_names_file):
+            if name[0] == '[isim]':
+                continue
+            male_names_list.append((name[0], int(name[1])))
     female_names_list = []
-    for name in female_names:
-        if name[0] == '[isim]':
-            continue
-        female_names_list.append((name[0], int(name[1])))
-
-    # Create mixed list
-    mixed_list = []
+    with open('src/names/tr_isim_kadin.csv', 'r', buffering=1 << 20, newline='') as female_names_file:
+        for name in csv.reader(female_names_file):
+            if name[0] == '[isim]':
+                continue
+            female_names_list.append((name[0], int(name[1])))
 
-    min_length = min(len(male_names_list), len(female_names_list))
-    for index in range(min_length):
-        mixed_list.append(female_names_list[index])
-        mixed_list.append(male_names_list[index])
-    female_names_list = female_names_list[min_length]
-    for name in female_names_list:
-        mixed_list.append(name)
+    # Create mixed list, alternating female and male names and keeping the tail of the longer list
+    mixed_list = [name for pair in zip_longest(female_names_list, male_names_list) for name in pair if name is not None]
 
     # Sort the list according to use count
     def sort_tuple(tup):
-        # getting length of list of tuples
-        lst = len(tup)
-        for i in range(0, lst):
-            for j in range(0, lst - i - 1):
-                try:
-                    if (tup[j][1] < tup[j + 1][1]):
-                        temp = tup[j]
-                        tup[j] = tup[j + 1]
-                        tup[j + 1] = temp
-                except:
-                    pass
-        return tup
+        # Most used names first, ties keep their original order
+        return sorted(tup, key=itemgetter(1), reverse=True)
 
     mixed_list = sort_tuple(mixed_list[start:item_count])
 
     # Write to file
-    output = open('src/names/ordered_mixed_name_list.csv', 'wb')
-    csv_out = csv.writer(output)
-    for row in mixed_list:
-        try:
-            csv_out.writerow(row)
-        except:
-            pass
+    with open('src/names/ordered_mixed_name_list.csv', 'w', buffering=1 << 20, newline='') as output:
+        csv_out = csv.writer(output)
+        for row in mixed_list:
+            try:
+                csv_out.writerow(row)
+            except:
+                pass
@@ -10,34 +10,79 @@ details of the supported formats, conventions and conversions.
 """
 
 import collections
+import functools
 import re
 import string
-import struct
-
-import six
+import sys
+from types import MappingProxyType
 
 
 __version__ = '1.10'
 
 
-def _reversedict(d):
+def _reversedict(d, preferred=None):
     """
     Internal helper for generating reverse mappings; given a
     dictionary, returns a new dictionary with keys and values swapped.
 
+    The optional ``preferred`` dictionary maps values to the key that
+    should be returned for them, for values shared by several keys.
+
+    """
+    reversed_d = {value: key for key, value in d.items()}
+    if preferred:
+        reversed_d.update(preferred)
+    return reversed_d
+
+
+def _interndict(d):
     """
-    return {value: key for key, value in d.items()}
+    Internal helper for interning the keys of the name mappings; given
+    a dictionary, returns a new dictionary with the same items, keyed
+    by interned strings.
+
+    """
+    return {sys.intern(key): value for key, value in d.items()}
 
 
 HEX_COLOR_RE = re.compile(r'^#([a-fA-F0-9]{3}|[a-fA-F0-9]{6})$')
 
-HTML4 = u'html4'
-CSS2 = u'css2'
-CSS21 = u'css21'
-CSS3 = u'css3'
+# The ASCII hex digits as a set, for per-character membership tests.
+_HEXDIGITS = frozenset(string.hexdigits)
+
+
+# Matches any character that is not an ASCII hex digit.
+_NON_HEX_RE = re.compile(r'[^0-9a-fA-F]')
+
+
+class _NonBMPToZeros(dict):
+    """
+    Internal translation table for ``str.translate()``, mapping every
+    character outside the basic multilingual plane to "00" and leaving
+    all other characters unchanged.
+
+    """
+    def __missing__(self, codepoint):
+        return u'00' if codepoint > 0xffff else codepoint
+
+
+_NON_BMP_TO_ZEROS = _NonBMPToZeros()
+
+# Two-digit lowercase hexadecimal form of every integer 0-255, used by
+# rgb_to_hex() in place of string formatting.
+_HEX2 = tuple(u'{:02x}'.format(i) for i in range(256))
+
+HTML4 = sys.intern(u'html4')
+CSS2 = sys.intern(u'css2')
+CSS21 = sys.intern(u'css21')
+CSS3 = sys.intern(u'css3')
 
 SUPPORTED_SPECIFICATIONS = (HTML4, CSS2, CSS21, CSS3)
 
+# Hashed membership test for the ``spec`` checks; the tuple above is
+# kept for its ordering in the error message.
+_SUPPORTED_SPECIFICATIONS_SET = frozenset(SUPPORTED_SPECIFICATIONS)
+
 SPECIFICATION_ERROR_TEMPLATE = u'{{spec}} is not a supported specification for color name lookups; \
 supported specifications are: {supported}.'.format(
     supported=','.join(SUPPORTED_SPECIFICATIONS)
@@ -82,6 +127,7 @@ HTML4_NAMES_TO_HEX = {
     u'beyazı': u'#ffffff',
     u'sarısı': u'#ffff00',
 }
+HTML4_NAMES_TO_HEX = _interndict(HTML4_NAMES_TO_HEX)
 
 # CSS 2 used the same list as HTML 4.
 CSS2_NAMES_TO_HEX = HTML4_NAMES_TO_HEX
@@ -187,6 +233,7 @@ CSS3_NAMES_TO_HEX = {
     u'burgonyası': u'#900020',
     u'devedikeni': u'#d8bfd8',
 }
+CSS3_NAMES_TO_HEX = _interndict(CSS3_NAMES_TO_HEX)
 
 
 # Mappings of normalized hexadecimal color values to color names.
@@ -198,8 +245,6 @@ CSS2_HEX_TO_NAMES = HTML4_HEX_TO_NAMES
 
 CSS21_HEX_TO_NAMES = _reversedict(CSS21_NAMES_TO_HEX)
 
-CSS3_HEX_TO_NAMES = _reversedict(CSS3_NAMES_TO_HEX)
-
 # CSS3 defines both 'gray' and 'grey', as well as defining either
 # variant for other related colors like 'darkgray'/'darkgrey'. For a
 # 'forward' lookup from name to hex, this is straightforward, but a
@@ -212,11 +257,27 @@ CSS3_HEX_TO_NAMES = _reversedict(CSS3_NAMES_TO_HEX)
 # consistency. So here we manually pick a single spelling that will
 # consistently be returned. Since 'gray' was the only spelling
 # supported in HTML 4, CSS1, and CSS2, 'gray' and its varients are
-# chosen.
-CSS3_HEX_TO_NAMES[u'#a9a9a9'] = u'koyu grisi'
-CSS3_HEX_TO_NAMES[u'#696969'] = u'soluk grisi'
-CSS3_HEX_TO_NAMES[u'#808080'] = u'grisi'
-CSS3_HEX_TO_NAMES[u'#d3d3d3'] = u'açık grisi'
+# chosen. The same applies to 'aqua' and 'cyan', which share #00ffff;
+# the spelling previously chosen by dictionary order is pinned.
+CSS3_HEX_TO_NAMES = _reversedict(CSS3_NAMES_TO_HEX, preferred={
+    u'#a9a9a9': u'koyu grisi',
+    u'#696969': u'soluk grisi',
+    u'#808080': u'grisi',
+    u'#d3d3d3': u'açık grisi',
+    u'#00ffff': u'siyanı',
+})
+
+# All of the mappings above are final at this point; expose them as
+# read-only views so they can't be modified by accident.
+HTML4_NAMES_TO_HEX = MappingProxyType(HTML4_NAMES_TO_HEX)
+CSS2_NAMES_TO_HEX = HTML4_NAMES_TO_HEX
+CSS21_NAMES_TO_HEX = MappingProxyType(CSS21_NAMES_TO_HEX)
+CSS3_NAMES_TO_HEX = MappingProxyType(CSS3_NAMES_TO_HEX)
+
+HTML4_HEX_TO_NAMES = MappingProxyType(HTML4_HEX_TO_NAMES)
+CSS2_HEX_TO_NAMES = HTML4_HEX_TO_NAMES
+CSS21_HEX_TO_NAMES = MappingProxyType(CSS21_HEX_TO_NAMES)
+CSS3_HEX_TO_NAMES = MappingProxyType(CSS3_HEX_TO_NAMES)
 
 
 # Aliases of the above mappings, for backwards compatibility.
@@ -238,9 +299,27 @@ CSS3_HEX_TO_NAMES[u'#d3d3d3'] = u'açık grisi'
                        CSS3_HEX_TO_NAMES)
 
 
+# Lookup tables for each specification, built once for the dispatch
+# in name_to_hex() and hex_to_name().
+_NAMES_TO_HEX_BY_SPEC = {
+    HTML4: HTML4_NAMES_TO_HEX,
+    CSS2: CSS2_NAMES_TO_HEX,
+    CSS21: CSS21_NAMES_TO_HEX,
+    CSS3: CSS3_NAMES_TO_HEX
+}
+
+_HEX_TO_NAMES_BY_SPEC = {
+    HTML4: HTML4_HEX_TO_NAMES,
+    CSS2: CSS2_HEX_TO_NAMES,
+    CSS21: CSS21_HEX_TO_NAMES,
+    CSS3: CSS3_HEX_TO_NAMES
+}
+
+
 # Normalization functions.
 #################################################################
 
+@functools.lru_cache(maxsize=256)
 def normalize_hex(hex_value):
     """
     Normalize a hexadecimal color value to 6 digits, lowercase.
@@ -257,26 +336,34 @@ def normalize_hex(hex_value):
     return u'#{}'.format(hex_digits.lower())
 
 
-def _normalize_integer_rgb(value):
+def normalize_integer_triplet(rgb_triplet):
     """
-    Internal normalization function for clipping integer values into
-    the permitted range (0-255, inclusive).
+    Normalize an integer ``rgb()`` triplet so that all values are
+    within the range 0-255 inclusive.
 
     """
-    return 0 if value < 0 \
-        else 255 if value > 255 \
-        else value
+    red, green, blue = rgb_triplet
+    # min() and max() return their first argument on ties, so in-range
+    # values such as 255.0 keep their original type.
+    return IntegerRGB(
+        max(min(red, 255), 0),
+        max(min(green, 255), 0),
+        max(min(blue, 255), 0)
+    )
 
 
-def normalize_integer_triplet(rgb_triplet):
+def _parse_percent(value):
     """
-    Normalize an integer ``rgb()`` triplet so that all values are
-    within the range 0-255 inclusive.
+    Internal helper for parsing a percentage value to a number clipped
+    into the permitted range (0-100, inclusive).
 
     """
-    return IntegerRGB._make(
-        _normalize_integer_rgb(value) for value in rgb_triplet
-    )
+    percent = value.split(u'%')[0]
+    percent = float(percent) if u'.' in percent else int(percent)
+
+    # min() and max() return their first argument on ties, so in-range
+    # values such as 100.0 keep their original type.
+    return max(min(percent, 100), 0)
 
 
 def _normalize_percent_rgb(value):
@@ -285,12 +372,7 @@ def _normalize_percent_rgb(value):
     the permitted range (0%-100%, inclusive).
 
     """
-    percent = value.split(u'%')[0]
-    percent = float(percent) if u'.' in percent else int(percent)
-
-    return u'0%' if percent < 0 \
-        else u'100%' if percent > 100 \
-        else u'{}%'.format(percent)
+    return u'{}%'.format(_parse_percent(value))
 
 
 def normalize_percent_triplet(rgb_triplet):
@@ -299,14 +381,18 @@ def normalize_percent_triplet(rgb_triplet):
     within the range 0%-100% inclusive.
 
     """
-    return PercentRGB._make(
-        _normalize_percent_rgb(value) for value in rgb_triplet
+    red, green, blue = rgb_triplet
+    return PercentRGB(
+        _normalize_percent_rgb(red),
+        _normalize_percent_rgb(green),
+        _normalize_percent_rgb(blue)
     )
 
 
 # Conversions from color names to various formats.
 #################################################################
 
+@functools.lru_cache(maxsize=256)
 def name_to_hex(name, spec=CSS3):
     """
     Convert a color name to a normalized hexadecimal color value.
@@ -319,15 +405,10 @@ def name_to_hex(name, spec=CSS3):
     ``ValueError`` is raised.
 
     """
-    if spec not in SUPPORTED_SPECIFICATIONS:
+    if spec not in _SUPPORTED_SPECIFICATIONS_SET:
         raise ValueError(SPECIFICATION_ERROR_TEMPLATE.format(spec=spec))
     normalized = name.lower()
-    hex_value = {
-        CSS2: CSS2_NAMES_TO_HEX,
-        CSS21: CSS21_NAMES_TO_HEX,
-        CSS3: CSS3_NAMES_TO_HEX,
-        HTML4: HTML4_NAMES_TO_HEX
-    }[spec].get(normalized)
+    hex_value = _NAMES_TO_HEX_BY_SPEC[spec].get(normalized)
     if hex_value is None:
         raise ValueError(
             u"'{name}' is not defined as a named color in {spec}".format(
@@ -358,6 +439,7 @@ def name_to_rgb_percent(name, spec=CSS3):
 # Conversions from hexadecimal color values to various formats.
 #################################################################
 
+@functools.lru_cache(maxsize=256)
 def hex_to_name(hex_value, spec=CSS3):
     """
     Convert a hexadecimal color value to its corresponding normalized
@@ -371,15 +453,10 @@ def hex_to_name(hex_value, spec=CSS3):
     specification, ``ValueError`` is raised.
 
     """
-    if spec not in SUPPORTED_SPECIFICATIONS:
+    if spec not in _SUPPORTED_SPECIFICATIONS_SET:
         raise ValueError(SPECIFICATION_ERROR_TEMPLATE.format(spec=spec))
     normalized = normalize_hex(hex_value)
-    name = {
-        CSS2: CSS2_HEX_TO_NAMES,
-        CSS21: CSS21_HEX_TO_NAMES,
-        CSS3: CSS3_HEX_TO_NAMES,
-        HTML4: HTML4_HEX_TO_NAMES
-    }[spec].get(normalized)
+    name = _HEX_TO_NAMES_BY_SPEC[spec].get(normalized)
     if name is None:
         raise ValueError(
             u"'{}' has no defined color name in {}".format(hex_value, spec)
@@ -387,19 +464,15 @@ def hex_to_name(hex_value, spec=CSS3):
     return name
 
 
+@functools.lru_cache(maxsize=256)
 def hex_to_rgb(hex_value):
     """
     Convert a hexadecimal color value to a 3-tuple of integers
     suitable for use in an ``rgb()`` triplet specifying that color.
 
     """
-    hex_value = normalize_hex(hex_value)
-    hex_value = int(hex_value[1:], 16)
-    return IntegerRGB(
-        hex_value >> 16,
-        hex_value >> 8 & 0xff,
-        hex_value & 0xff
-    )
+    red, green, blue = bytes.fromhex(normalize_hex(hex_value)[1:])
+    return IntegerRGB(red, green, blue)
 
 
 def hex_to_rgb_percent(hex_value):
@@ -443,11 +516,19 @@ def rgb_to_hex(rgb_triplet):
     color triplet, to a normalized hexadecimal value for that color.
 
     """
-    return u'#{:02x}{:02x}{:02x}'.format(
-        *normalize_integer_triplet(
-            rgb_triplet
+    red, green, blue = rgb_triplet
+    try:
+        return u'#' + _HEX2[max(min(red, 255), 0)] + \
+            _HEX2[max(min(green, 255), 0)] + \
+            _HEX2[max(min(blue, 255), 0)]
+    except TypeError:
+        # Non-integer components can't index the table; formatting
+        # them raises the same ValueError this function always has.
+        return u'#{:02x}{:02x}{:02x}'.format(
+            *normalize_integer_triplet(
+                rgb_triplet
+            )
         )
-    )
 
 
 def rgb_to_rgb_percent(rgb_triplet):
@@ -493,9 +574,7 @@ def rgb_percent_to_name(rgb_percent_triplet, spec=CSS3):
     """
     return rgb_to_name(
         rgb_percent_to_rgb(
-            normalize_percent_triplet(
-                rgb_percent_triplet
-            )
+            rgb_percent_triplet
         ),
         spec=spec
     )
@@ -510,9 +589,7 @@ def rgb_percent_to_hex(rgb_percent_triplet):
     """
     return rgb_to_hex(
         rgb_percent_to_rgb(
-            normalize_percent_triplet(
-                rgb_percent_triplet
-            )
+            rgb_percent_triplet
         )
     )
 
@@ -522,12 +599,12 @@ def _percent_to_integer(percent):
     Internal helper for converting a percentage value to an integer
     between 0 and 255 inclusive.
 
+    The percentage is clipped into the permitted range (0%-100%,
+    inclusive) as it is parsed, so callers don't need to normalize it
+    first.
+
     """
-    return int(
-        round(
-            float(percent.split(u'%')[0]) / 100 * 255
-        )
-    )
+    return int(round(_parse_percent(percent) / 100 * 255))
 
 
 def rgb_percent_to_rgb(rgb_percent_triplet):
@@ -540,13 +617,11 @@ def rgb_percent_to_rgb(rgb_percent_triplet):
     regarding precision for ``rgb_to_rgb_percent()`` for details.
 
     """
-    return IntegerRGB._make(
-        map(
-            _percent_to_integer,
-            normalize_percent_triplet(
-                rgb_percent_triplet
-            )
-        )
+    red, green, blue = rgb_percent_triplet
+    return IntegerRGB(
+        _percent_to_integer(red),
+        _percent_to_integer(green),
+        _percent_to_integer(blue)
     )
 
 
@@ -573,7 +648,7 @@ def html5_parse_simple_color(input):
     #
     # 2. If input is not exactly seven characters long, then return an
     #    error.
-    if not isinstance(input, six.text_type) or len(input) != 7:
+    if not isinstance(input, str) or len(input) != 7:
         raise ValueError(
             u"An HTML5 simple color must be a Unicode string "
             u"exactly seven characters long."
@@ -589,11 +664,7 @@ def html5_parse_simple_color(input):
 
     # 4. If the last six characters of input are not all ASCII hex
     #    digits, then return an error.
-    if not all(c in string.hexdigits for c in input[1:]):
-        raise ValueError(
-            u"An HTML5 simple color must contain exactly six ASCII hex digits."
-        )
-
+    #
     # 5. Let result be a simple color.
     #
     # 6. Interpret the second and third characters as a hexadecimal
@@ -605,12 +676,19 @@ def html5_parse_simple_color(input):
     # 8. Interpret the sixth and seventh characters as a hexadecimal
     #    number and let the result be the blue component of result.
     #
+    # bytes.fromhex() performs the check in step 4 and the parsing in
+    # steps 6-8 in one pass. It skips whitespace between digit pairs,
+    # but any whitespace leaves fewer than three bytes, which fails
+    # the unpacking below with the same error.
+    try:
+        red, green, blue = bytes.fromhex(input[1:])
+    except ValueError:
+        raise ValueError(
+            u"An HTML5 simple color must contain exactly six ASCII hex digits."
+        )
+
     # 9. Return result.
-    return HTML5SimpleColor(
-        int(input[1:3], 16),
-        int(input[3:5], 16),
-        int(input[5:7], 16)
-    )
+    return HTML5SimpleColor(red, green, blue)
 
 
 def html5_serialize_simple_color(simple_color):
@@ -645,7 +723,7 @@ def html5_parse_legacy_color(input):
 
     """
     # 1. Let input be the string being parsed.
-    if not isinstance(input, six.text_type):
+    if not isinstance(input, str):
         raise ValueError(
             u"HTML5 legacy color parsing requires a Unicode string as input."
         )
@@ -680,7 +758,7 @@ def html5_parse_legacy_color(input):
     #    substeps:
     if len(input) == 4 and \
        input.startswith(u'#') and \
-       all(c in string.hexdigits for c in input[1:]):
+       all(c in _HEXDIGITS for c in input[1:]):
         # 1. Let result be a simple color.
         #
         # 2. Interpret the second character of input as a hexadecimal
@@ -707,41 +785,14 @@ def html5_parse_legacy_color(input):
     #    point greater than U+FFFF (i.e. any characters that are not
     #    in the basic multilingual plane) with the two-character
     #    string "00".
-
-    # This one's a bit weird due to the existence of multiple internal
-    # Unicode string representations in different versions and builds
-    # of Python.
     #
-    # From Python 2.2 through 3.2, Python could be compiled with
-    # "narrow" or "wide" Unicode strings (see PEP 261). Narrow builds
-    # handled Unicode strings with two-byte characters and surrogate
-    # pairs for non-BMP code points. Wide builds handled Unicode
-    # strings with four-byte characters and no surrogates. This means
-    # ord() is only sufficient to identify a non-BMP character on a
-    # wide build.
-    #
-    # Starting with Python 3.3, the internal string representation
-    # (see PEP 393) is now dynamic, and Python chooses an encoding --
-    # either latin-1, UCS-2 or UCS-4 -- wide enough to handle the
-    # highest code point in the string.
-    #
-    # The code below bypasses all of that for a consistently effective
-    # method: encode the string to little-endian UTF-32, then perform
-    # a binary unpack of it as four-byte integers. Those integers will
-    # be the Unicode code points, and from there filtering out non-BMP
-    # code points is easy.
-    encoded_input = input.encode('utf_32_le')
-
-    # Format string is '<' (for little-endian byte order), then a
-    # sequence of 'L' characters (for 4-byte unsigned long integer)
-    # equal to the length of the original string, which is also
-    # one-fourth the encoded length.  For example, for a six-character
-    # input the generated format string will be '<LLLLLL'.
-    format_string = '<' + ('L' * (int(len(encoded_input) / 4)))
-    codepoints = struct.unpack(format_string, encoded_input)
-    input = ''.join(u'00' if c > 0xffff
-                    else six.unichr(c)
-                    for c in codepoints)
+    # Since Python 3.3 (PEP 393) strings no longer come in narrow and
+    # wide builds, so every character's code point is available
+    # directly and str.translate() can do the replacement in one pass.
+    # Most input has no such characters, which max() checks in C
+    # before any per-character translation is done.
+    if input and max(input) > u'\uffff':
+        input = input.translate(_NON_BMP_TO_ZEROS)
 
     # 8. If input is longer than 128 characters, truncate input,
     #    leaving only the first 128 characters.
@@ -755,13 +806,17 @@ def html5_parse_legacy_color(input):
 
     # 10. Replace any character in input that is not an ASCII hex
     #     digit with the character "0" (U+0030).
-    if any(c for c in input if c not in string.hexdigits):
-        input = ''.join(c if c in string.hexdigits else u'0' for c in input)
+    input = _NON_HEX_RE.sub(u'0', input)
 
     # 11. While input's length is zero or not a multiple of three,
     #     append a "0" (U+0030) character to input.
-    while (len(input) == 0) or (len(input) % 3 != 0):
-        input += u'0'
+    #
+    # The number of characters needed is computed up front so the
+    # padding is appended in one go.
+    if len(input) == 0:
+        input = u'000'
+    else:
+        input += u'0' * (-len(input) % 3)
 
     # 12. Split input into three strings of equal length, to obtain
     #     three components. Let length be the length of those
@@ -782,13 +837,19 @@ def html5_parse_legacy_color(input):
     # 14. While length is greater than two and the first character in
     #     each component is a "0" (U+0030) character, remove that
     #     character and reduce length by one.
-    while (length > 2) and (red[0] == u'0' and
-                            green[0] == u'0' and
-                            blue[0] == u'0'):
-        red, green, blue = (red[1:],
-                            green[1:],
-                            blue[1:])
-        length -= 1
+    #
+    # The shared leading zeros are counted first and then removed with
+    # a single slice per component.
+    zeros = 0
+    while (length - zeros > 2) and (red[zeros] == u'0' and
+                                    green[zeros] == u'0' and
+                                    blue[zeros] == u'0'):
+        zeros += 1
+    if zeros:
+        red, green, blue = (red[zeros:],
+                            green[zeros:],
+                            blue[zeros:])
+        length -= zeros
 
     # 15. If length is still greater than two, truncate each
     #     component, leaving only the first two characters in each.